@@ -15,6 +15,7 @@
 
 # system
 from pathlib import Path
+from contextlib import closing
 import sys
 
 # external software
@@ -30,10 +31,20 @@ from importlib.metadata import version
 # Project Packages
 from ir_pell_accepts.io_utils import infer_and_read_file
 from ir_pell_accepts.paths import CONFIG_PATH
-from ir_pell_accepts.headcount_calcs import grs_cohort_pell, grs_cohort, total_headcount, fall_enrollment
-from ir_pell_accepts.clean import remove_leading_zeros
+from ir_pell_accepts.headcount_calcs import grs_cohort_pell, grs_cohort, total_headcount, fall_enrollment, term_headcounts_and_populations, population_gaps
+from ir_pell_accepts.clean import remove_leading_zeros, compact_columns
+from ir_pell_accepts.checks import PELL_REQUIRED_COLUMNS, COHORT_REQUIRED_COLUMNS, ENROLLMENT_REQUIRED_COLUMNS
+from ir_pell_accepts.memory import check_memory_budget
 from ir_pell_accepts.helper import calc_percent
-from ir_pell_accepts.output import output_results, contruct_results_df
+from ir_pell_accepts.output import output_results, contruct_results_df, results_df_from_headcounts
+from ir_pell_accepts.results_store import open_results_store, append_results
+
+
+def report_memory(budget_mb: float, stage: str) -> None:
+    """Print peak memory after a stage; check_memory_budget stops the run if it is over budget."""
+    peak = check_memory_budget(budget_mb, stage=stage)
+    if peak is not None:
+        print(f"[memory] {stage}: peak {peak:,.1f} MB of {budget_mb:,.1f} MB budget")
 
 
 # In[2]:
@@ -68,11 +79,22 @@ PELL_PATH = DIR / Path(config["box_repo"]["pell_file"]).expanduser()
 RETENTION_PATH = Path(config["box_repo"]["retention_dir"]).expanduser() / Path(config["box_repo"]["retention_file"]).expanduser()
 ENROLLMENT_PATH = Path(config["box_repo"]["enrollment_dir"]).expanduser() / Path(config["box_repo"]["enrollment_file"]).expanduser()
 RESULTS_PATH = Path(config["box_repo"]["results_dir"]) / Path(config["box_repo"]["results_file"])
+# Optional SQLite results history store; leave blank/null in config.yaml to skip
+# (kept outside box_repo: the SQLite file must live on a local disk, not a synced folder)
+results_db = (config.get("local_store") or {}).get("results_db")
+RESULTS_DB = Path(results_db).expanduser() if results_db else None
 
 # Project Parameters
 term = config["params"]["term"] 
 id_column = config["params"]["id_column"]
 
+# Memory-budget mode (MB): peak memory is checked after each stage, not enforced during one;
+# leave blank/null in config.yaml to read the full files as before
+memory_budget_mb = config["params"].get("memory_budget_mb")
+
+# Student-level drilldown export (one row per student, a flag per headcount, plus a reconciliation)
+drilldown = config["params"].get("drilldown", False)
+
 
 # In[4]:
 
@@ -96,76 +118,115 @@ if not ENROLLMENT_PATH.exists():
 if not RESULTS_PATH.parent.exists():
     raise FileNotFoundError(f"Results path does not exist: {RESULTS_PATH.parent}")
 
+if RESULTS_DB is not None and not RESULTS_DB.parent.exists():
+    raise FileNotFoundError(f"Results store path does not exist: {RESULTS_DB.parent}")
+
 if len(term) != 6:
     raise ValueError(f"Value for term, {term}, is invalid. Needs to be a 6 digit numeric. Ex: '202580'")
 
+if memory_budget_mb is not None and (not isinstance(memory_budget_mb, (int, float)) or memory_budget_mb <= 0):
+    raise ValueError(f"Value for memory_budget_mb, {memory_budget_mb}, is invalid. Needs to be a positive number of MB. Ex: 6144")
+
 
 # In[5]:
 
 
 # Read in files (all columns coverted to strings)
-df_pell = infer_and_read_file(PELL_PATH)
-df_ret  = infer_and_read_file(RETENTION_PATH)
-df_enrl = infer_and_read_file(ENROLLMENT_PATH)
+if memory_budget_mb is None:
+    df_pell = infer_and_read_file(PELL_PATH)
+    df_ret  = infer_and_read_file(RETENTION_PATH)
+    df_enrl = infer_and_read_file(ENROLLMENT_PATH)
+else:
+    # Memory-budget mode: only read the columns the calculations use
+    df_pell = infer_and_read_file(PELL_PATH, usecols={id_column, *PELL_REQUIRED_COLUMNS})
+    df_ret  = infer_and_read_file(RETENTION_PATH, usecols={id_column, *COHORT_REQUIRED_COLUMNS})
+    df_enrl = infer_and_read_file(ENROLLMENT_PATH, usecols={id_column, *ENROLLMENT_REQUIRED_COLUMNS})
+    report_memory(memory_budget_mb, stage="read files")
 
 
 # In[6]:
 
 
 # Standardize ID column
-df_pell = remove_leading_zeros(df_pell, column=id_column)
-df_ret  = remove_leading_zeros(df_ret, column=id_column)
-df_enrl = remove_leading_zeros(df_enrl, column=id_column)
+if memory_budget_mb is None:
+    df_pell = remove_leading_zeros(df_pell, column=id_column)
+    df_ret  = remove_leading_zeros(df_ret, column=id_column)
+    df_enrl = remove_leading_zeros(df_enrl, column=id_column)
+else:
+    # Rewrite only the ID column in place and store the filter columns as categoricals
+    remove_leading_zeros(df_pell, column=id_column, inplace=True)
+    remove_leading_zeros(df_ret, column=id_column, inplace=True)
+    remove_leading_zeros(df_enrl, column=id_column, inplace=True)
+    compact_columns(df_pell, columns=sorted(PELL_REQUIRED_COLUMNS))
+    compact_columns(df_ret, columns=sorted(COHORT_REQUIRED_COLUMNS))
+    compact_columns(df_enrl, columns=sorted(ENROLLMENT_REQUIRED_COLUMNS))
+    report_memory(memory_budget_mb, stage="standardize ID column")
 
 
 # In[8]:
 
 
-# Incoming first-time students
-##
-pell_first = grs_cohort_pell(dfp=df_pell, dfr=df_ret, id_column='ID', term=term, 
-                            aid_year_column='AID_YEAR', cohort_column='Cohort Name')
-cohort_first = grs_cohort(dfr=df_ret, id_column='ID', term=term, cohort_column='Cohort Name')
-##
+populations = gaps = None
+if drilldown:
+    # Headcounts and drilldown populations from one build of the ID sets, so they cannot drift apart
+    counts, populations = term_headcounts_and_populations(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term)
+    df_results = results_df_from_headcounts(counts)
+    gaps = population_gaps(counts, populations)
+else:
+    # Incoming first-time students
+    ##
+    pell_first = grs_cohort_pell(dfp=df_pell, dfr=df_ret, id_column='ID', term=term, 
+                                aid_year_column='AID_YEAR', cohort_column='Cohort Name')
+    cohort_first = grs_cohort(dfr=df_ret, id_column='ID', term=term, cohort_column='Cohort Name')
+    ##
+
+
+    # Total fall enrollment
+    headcount = total_headcount(dfe=df_enrl, term=term, id_column=id_column)
 
 
-# Total fall enrollment
-headcount = total_headcount(dfe=df_enrl, term=term, id_column=id_column)
+    # Separate out incoming transfer students (nottr = not an incoming transfer student)
+    ###
+    headcount_nottr = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=False, transfer=False)
+    pell_nottr = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=True, transfer=False)
+    headcount_transfer = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=False, transfer=True)
+    transfer_pell = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=True, transfer=True)
+    ###
 
 
-# Separate out incoming transfer students (nottr = not an incoming transfer student)
-###
-headcount_nottr = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=False, transfer=False)
-pell_nottr = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=True, transfer=False)
-headcount_transfer = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=False, transfer=True)
-transfer_pell = fall_enrollment(dfp=df_pell, dfr=df_ret, dfe=df_enrl, id_column=id_column, term=term, pell=True, transfer=True)
-###
+    # Calculate Percentages to 2 percentage decimal points
+    ##
+    pell_first_pct = calc_percent(pell_first, cohort_first)
+    pell_nottr_pct = calc_percent(pell_nottr, headcount_nottr, 2)
+    pell_transfer_pct = calc_percent(transfer_pell, headcount_transfer, 2)
+    ##
 
 
-# Calculate Percentages to 2 percentage decimal points
-##
-pell_first_pct = calc_percent(pell_first, cohort_first)
-pell_nottr_pct = calc_percent(pell_nottr, headcount_nottr, 2)
-pell_transfer_pct = calc_percent(transfer_pell, headcount_transfer, 2)
-##
+    df_results = contruct_results_df(
+        cohort_first       = cohort_first, 
+        pell_first         = pell_first, 
+        headcount_nottr    = headcount_nottr, 
+        pell_nottr         = pell_nottr,
+        headcount_transfer = headcount_transfer, 
+        transfer_pell      = transfer_pell, 
+        headcount          = headcount, 
+        pell_first_pct     = pell_first_pct, 
+        pell_nottr_pct     = pell_nottr_pct, 
+        pell_transfer_pct  = pell_transfer_pct
+    ) 
 
+if memory_budget_mb is not None:
+    report_memory(memory_budget_mb, stage="headcount calculations")
 
 
 # In[9]:
 
 
-df_results = contruct_results_df(
-    cohort_first       = cohort_first, 
-    pell_first         = pell_first, 
-    headcount_nottr    = headcount_nottr, 
-    pell_nottr         = pell_nottr,
-    headcount_transfer = headcount_transfer, 
-    transfer_pell      = transfer_pell, 
-    headcount          = headcount, 
-    pell_first_pct     = pell_first_pct, 
-    pell_nottr_pct     = pell_nottr_pct, 
-    pell_transfer_pct  = pell_transfer_pct
-) 
+output_results(df_results, RESULTS_PATH, populations=populations, id_column=id_column, population_gaps=gaps)
 
-output_results(df_results, RESULTS_PATH)
+if memory_budget_mb is not None:
+    report_memory(memory_budget_mb, stage="write results")
 
+if RESULTS_DB is not None:
+    with closing(open_results_store(RESULTS_DB)) as conn:
+        append_results(conn, df_results, term=term)
@@ -1,6 +1,12 @@
 from pathlib import Path
 import pandas as pd
 
+# Columns each input file needs beyond the ID column. Used both to validate the
+# dataframes and to limit which columns are read in memory-budget mode.
+PELL_REQUIRED_COLUMNS = {"AID_YEAR"}
+COHORT_REQUIRED_COLUMNS = {"Cohort Name"}
+ENROLLMENT_REQUIRED_COLUMNS = {"Academic Period", "Time Status", "Student Level", "Degree"}
+
 def validate_filename(path_arg) -> Path:
     """
     Validates that `path_arg` is a filename (no directory)
@@ -31,9 +37,7 @@ def validate_pell_columns(df: pd.DataFrame, id_column: str, required_cols: set[s
     
     # Build default required columns if none supplied
     if required_cols is None:
-        required_cols = {
-            "AID_YEAR"
-       }
+        required_cols = PELL_REQUIRED_COLUMNS
 
     required_cols = set(required_cols)  # convert user input to a set
     required_cols.add(id_column)
@@ -48,9 +52,7 @@ def validate_cohort_columns(df: pd.DataFrame, id_column: str, required_cols: set
     
     # Build default required columns if none supplied
     if required_cols is None:
-        required_cols = {
-            "Cohort Name"
-       }
+        required_cols = COHORT_REQUIRED_COLUMNS
 
     required_cols = set(required_cols)  # convert user input to a set
     required_cols.add(id_column)
@@ -65,12 +67,7 @@ def validate_enrollment_columns(df: pd.DataFrame, id_column: str, required_cols:
     
     # Build default required columns if none supplied
     if required_cols is None:
-        required_cols = {
-            "Academic Period",
-            "Time Status",
-            "Student Level",
-            "Degree"
-        }
+        required_cols = ENROLLMENT_REQUIRED_COLUMNS
 
     required_cols = set(required_cols)  # convert user input to a set
     required_cols.add(id_column)
@@ -1,6 +1,6 @@
 import pandas as pd
 
-def remove_leading_zeros(df: pd.DataFrame, column: str) -> pd.DataFrame:
+def remove_leading_zeros(df: pd.DataFrame, column: str, inplace: bool = False) -> pd.DataFrame:
     """
     Remove leading zeros from a given column of a dataframe.
 
@@ -9,7 +9,10 @@ def remove_leading_zeros(df: pd.DataFrame, column: str) -> pd.DataFrame:
     df : pandas.DataFrame
     column : str
         name of column
-    
+    inplace : bool, default False
+        If True, rewrite df[column] in the given dataframe and return it. No copy
+        of the other columns is made, which keeps peak memory down on large files.
+
     Returns
     -------
     pandas.DataFrame
@@ -22,8 +25,43 @@ def remove_leading_zeros(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     if not column in df.columns:
         raise ValueError(f"{column} column is not present in the dataframe.")
-    
-    df = df.copy()
-    df['ID'] = df['ID'].astype(str).str.lstrip('0')
+
+    if not inplace:
+        df = df.copy()
+    df[column] = df[column].astype(str).str.lstrip('0')
+
+    return df
+
+
+def compact_columns(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """
+    Store low-cardinality string columns (e.g. "Time Status", "Cohort Name") as
+    pandas categoricals, in place.
+
+    Equality filters such as df[column] == "FT" behave the same on categoricals,
+    but each distinct value is stored once instead of once per row.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+    columns : list of str
+        names of columns to convert
+
+    Returns
+    -------
+    pandas.DataFrame
+        df is returned with the given columns converted to category dtype
+
+    Raises
+    ------
+    ValueError
+        If any of the columns are not present in df.
+    """
+    missing = set(columns) - set(df.columns)
+    if missing:
+        raise ValueError(f"Columns not present in the dataframe: {missing}")
+
+    for column in columns:
+        df[column] = df[column].astype("category")
 
     return df
@@ -2,6 +2,44 @@ import pandas as pd
 from ir_pell_accepts.helper import calc_academic_year_from_term, construct_cohort
 from ir_pell_accepts.checks import validate_pell_columns, validate_cohort_columns, validate_enrollment_columns
 
+def _pell_id_values(dfp: pd.DataFrame, id_column: str, term: str, aid_year_column: str = "AID_YEAR") -> pd.Series:
+    """IDs of Pell recipients in the aid year of the given term (may repeat)."""
+    aid_year = calc_academic_year_from_term(term)
+    return dfp.loc[dfp[aid_year_column] == aid_year, id_column].dropna()
+
+
+def _enrolled_id_values(dfe: pd.DataFrame, id_column: str, term: str) -> pd.Series:
+    """IDs of full-time, undergrad, degree-seeking students enrolled in the given term (may repeat)."""
+    enrollment_conditions = (
+        (dfe['Academic Period'] == term) &
+        (dfe['Time Status'] == 'FT') &
+        (dfe['Student Level'] == 'UG') &
+        (dfe['Degree'] != 'Non Degree')
+    )
+    return dfe.loc[enrollment_conditions, id_column].dropna()
+
+
+def _cohort_id_values(dfr: pd.DataFrame, id_column: str, cohort: str, cohort_column: str = "Cohort Name") -> pd.Series:
+    """IDs of students in the given cohort, e.g. "2025 Fall, First-Time, Full-Time" (may repeat)."""
+    return dfr.loc[dfr[cohort_column] == cohort, id_column].dropna()
+
+
+def _pell_ids(dfp: pd.DataFrame, id_column: str, term: str, aid_year_column: str = "AID_YEAR") -> set:
+    return set(_pell_id_values(dfp, id_column=id_column, term=term, aid_year_column=aid_year_column))
+
+
+def _enrolled_ids(dfe: pd.DataFrame, id_column: str, term: str) -> set:
+    return set(_enrolled_id_values(dfe, id_column=id_column, term=term))
+
+
+def _cohort_ids(dfr: pd.DataFrame, id_column: str, cohort: str, cohort_column: str = "Cohort Name") -> set:
+    return set(_cohort_id_values(dfr, id_column=id_column, cohort=cohort, cohort_column=cohort_column))
+
+
+def _incoming_transfer_cohort(term: str) -> str:
+    return term[0:4] + " " + "Fall, Transfer, Full-Time"
+
+
 def grs_cohort_pell(
     dfp: pd.DataFrame,
     dfr: pd.DataFrame,
@@ -42,14 +80,13 @@ def grs_cohort_pell(
     validate_pell_columns(df=dfp, id_column=id_column)
     validate_cohort_columns(df=dfr, id_column=id_column)
 
-    aid_year = calc_academic_year_from_term(term)
     cohort = construct_cohort(term)
     # Filter IDs by aid year and cohort
-    pids = dfp.loc[dfp[aid_year_column] == aid_year, id_column].dropna()
-    rids = dfr.loc[dfr[cohort_column] == cohort, id_column].dropna()
+    pids = _pell_ids(dfp, id_column=id_column, term=term, aid_year_column=aid_year_column)
+    rids = _cohort_ids(dfr, id_column=id_column, cohort=cohort, cohort_column=cohort_column)
 
     # Return overlap size
-    return len(set(pids) & set(rids))
+    return len(pids & rids)
 
 
 def grs_cohort(
@@ -113,12 +150,7 @@ def total_headcount(dfe: pd.DataFrame, term: str, id_column: str) -> int:
     """
     validate_enrollment_columns(df=dfe, id_column=id_column)
 
-    return dfe.loc[(
-        (dfe['Academic Period'] == term) & 
-        (dfe['Time Status'] == 'FT') & 
-        (dfe['Student Level'] == 'UG') &
-        (dfe['Degree'] != 'Non Degree')
-    ), id_column].nunique()
+    return len(_enrolled_ids(dfe, id_column=id_column, term=term))
 
 
 def fall_enrollment(
@@ -175,33 +207,240 @@ def fall_enrollment(
     validate_cohort_columns(df=dfr, id_column=id_column)
     validate_enrollment_columns(df=dfe, id_column=id_column)
 
-    enrollment_conditions = (
-        (dfe['Academic Period'] == term) &
-        (dfe['Time Status'] == 'FT') &
-        (dfe['Student Level'] == 'UG') &
-        (dfe['Degree'] != 'Non Degree')
-    )
-
-    aid_year = calc_academic_year_from_term(term) 
-    incoming_transfer_cohort = term[0:4] + " " + "Fall, Transfer, Full-Time"
-    
-    pids = dfp.loc[dfp['AID_YEAR'] == aid_year, id_column].dropna()
-    eids = dfe.loc[enrollment_conditions, id_column].dropna()
-    rids = dfr.loc[dfr['Cohort Name'] != incoming_transfer_cohort, id_column].dropna()
-    rids_t = dfr.loc[dfr['Cohort Name'] == incoming_transfer_cohort, id_column].dropna()
+    pids = _pell_ids(dfp, id_column=id_column, term=term)
+    eids = _enrolled_ids(dfe, id_column=id_column, term=term)
+    rids_t = _cohort_ids(dfr, id_column=id_column, cohort=_incoming_transfer_cohort(term))
          
-    n_pell_intr = len(set(pids) & set(eids) & set(rids_t))
+    n_pell_intr = len(pids & eids & rids_t)
     
     if not pell and not transfer:
         # size = len(set(eids) & set(rids)) # due to some students have too old of a cohort to be found in the cohort/retention file, they are being included in the fall enrollment non-incoming group. Hence "size = " has been updated to be the difference between the total enrollment minus the total incoming transfer
-        size = len(set(eids)) - len(set(rids_t))
+        size = len(eids) - len(rids_t)
     elif pell and not transfer:
         # size = len(set(eids) & set(rids)) # due to some students have too old of a cohort to be found in the cohort/retention file, they are being included in the fall enrollment non-incoming group. Hence "size = " has been updated to be the difference between the total enrollment minus the total incoming transfer pell
-        size = len(set(pids) & set(eids)) - n_pell_intr
+        size = len(pids & eids) - n_pell_intr
     elif not pell and transfer:
-        size = len(set(eids) & set(rids_t))
+        size = len(eids & rids_t)
     else:
         size = n_pell_intr
 
     # Return overlap size
     return size
+
+
+# Why a drilldown flag column can sum to a different number than the published figure
+POPULATION_GAP_NOTES = {
+    "grs_cohort": "figure counts cohort rows; students with duplicate cohort rows (or rows without an ID) are flagged once",
+    "fall_enrollment": "figure is total enrollment minus the whole incoming transfer cohort, including transfer cohort students who are not enrolled",
+}
+
+
+def _term_id_sets(
+    dfp: pd.DataFrame,
+    dfr: pd.DataFrame,
+    dfe: pd.DataFrame,
+    id_column: str,
+    term: str,
+) -> tuple[set, set, set, set]:
+    # Pell, enrolled, first-time cohort and incoming transfer cohort IDs of one term
+    validate_pell_columns(df=dfp, id_column=id_column)
+    validate_cohort_columns(df=dfr, id_column=id_column)
+    validate_enrollment_columns(df=dfe, id_column=id_column)
+
+    pids = _pell_ids(dfp, id_column=id_column, term=term)
+    eids = _enrolled_ids(dfe, id_column=id_column, term=term)
+    rids_f = _cohort_ids(dfr, id_column=id_column, cohort=construct_cohort(term))
+    rids_t = _cohort_ids(dfr, id_column=id_column, cohort=_incoming_transfer_cohort(term))
+
+    return pids, eids, rids_f, rids_t
+
+
+def _headcounts_from_ids(pids: set, eids: set, rids_f: set, rids_t: set) -> dict[str, int]:
+    """
+    The distinct-ID headcounts of the results file, with the same definitions as
+    grs_cohort_pell(), fall_enrollment() and total_headcount().
+
+    pids, eids, rids_f and rids_t are the Pell, enrolled, first-time cohort and
+    incoming transfer cohort IDs of one term (see _term_id_sets).
+    """
+    n_pell_intr = len(pids & eids & rids_t)
+
+    return {
+        "grs_cohort_pell": len(pids & rids_f),
+        "fall_enrollment": len(eids) - len(rids_t),
+        "fall_enrollment_pell": len(pids & eids) - n_pell_intr,
+        "fall_transfer_enrollment": len(eids & rids_t),
+        "fall_transfer_enroll_pell": n_pell_intr,
+        "total_enrollment": len(eids),
+    }
+
+
+def _populations_from_ids(pids: set, eids: set, rids_f: set, rids_t: set) -> dict[str, set]:
+    # The IDs behind each headcount of _headcounts_from_ids (plus grs_cohort), same inputs
+    return {
+        "grs_cohort": rids_f,
+        "grs_cohort_pell": pids & rids_f,
+        "fall_enrollment": eids - rids_t,
+        "fall_enrollment_pell": (pids & eids) - rids_t,
+        "fall_transfer_enrollment": eids & rids_t,
+        "fall_transfer_enroll_pell": pids & eids & rids_t,
+        "total_enrollment": eids,
+    }
+
+
+def term_headcounts(
+    dfp: pd.DataFrame,
+    dfr: pd.DataFrame,
+    dfe: pd.DataFrame,
+    id_column: str,
+    term: str,
+) -> dict[str, int]:
+    """
+    All headcounts of the results file for one term.
+
+    Keys match the count columns of output.contruct_results_df.
+
+    Parameters
+    ----------
+    dfp : pandas.DataFrame
+        Pell awards dataframe.
+    dfr : pandas.DataFrame
+        Retention / cohort dataframe.
+    dfe : pandas.DataFrame
+        Census Date Enrollment dataframe.
+    id_column : str
+        Column to use for student IDs; must exist in all dataframes (e.g., "ID").
+    term: str
+        Academic term (e.g. "202580")
+
+    Returns
+    -------
+    dict of str to int
+        Metric name -> headcount.
+
+    Raises
+    ------
+    ValueError
+        If any of the required column names are not present in their respective dataframes.
+    """
+    counts, _ = term_headcounts_and_populations(dfp=dfp, dfr=dfr, dfe=dfe, id_column=id_column, term=term)
+    return counts
+
+
+def metric_populations(
+    dfp: pd.DataFrame,
+    dfr: pd.DataFrame,
+    dfe: pd.DataFrame,
+    id_column: str,
+    term: str,
+) -> dict[str, set]:
+    """
+    The student IDs behind each headcount in the results file.
+
+    Keys match the count columns of output.contruct_results_df. Use
+    term_headcounts_and_populations to get the figures from the same ID sets,
+    and population_gaps to see where a set size differs from its figure
+    (see POPULATION_GAP_NOTES).
+
+    Parameters
+    ----------
+    dfp : pandas.DataFrame
+        Pell awards dataframe.
+    dfr : pandas.DataFrame
+        Retention / cohort dataframe.
+    dfe : pandas.DataFrame
+        Census Date Enrollment dataframe.
+    id_column : str
+        Column to use for student IDs; must exist in all dataframes (e.g., "ID").
+    term: str
+        Academic term (e.g. "202580")
+
+    Returns
+    -------
+    dict of str to set
+        Metric name -> set of student IDs counted in that metric.
+
+    Raises
+    ------
+    ValueError
+        If any of the required column names are not present in their respective dataframes.
+    """
+    _, populations = term_headcounts_and_populations(dfp=dfp, dfr=dfr, dfe=dfe, id_column=id_column, term=term)
+    return populations
+
+
+def term_headcounts_and_populations(
+    dfp: pd.DataFrame,
+    dfr: pd.DataFrame,
+    dfe: pd.DataFrame,
+    id_column: str,
+    term: str,
+) -> tuple[dict[str, int], dict[str, set]]:
+    """
+    The headcounts of the results file and the student IDs behind them, both
+    derived from one build of the Pell, enrollment and cohort ID sets.
+
+    Parameters
+    ----------
+    dfp : pandas.DataFrame
+        Pell awards dataframe.
+    dfr : pandas.DataFrame
+        Retention / cohort dataframe.
+    dfe : pandas.DataFrame
+        Census Date Enrollment dataframe.
+    id_column : str
+        Column to use for student IDs; must exist in all dataframes (e.g., "ID").
+    term: str
+        Academic term (e.g. "202580")
+
+    Returns
+    -------
+    tuple of (dict of str to int, dict of str to set)
+        Metric name -> headcount, and metric name -> student IDs.
+
+    Raises
+    ------
+    ValueError
+        If any of the required column names are not present in their respective dataframes.
+    """
+    pids, eids, rids_f, rids_t = _term_id_sets(dfp=dfp, dfr=dfr, dfe=dfe, id_column=id_column, term=term)
+
+    counts = {
+        "grs_cohort": grs_cohort(dfr=dfr, id_column=id_column, term=term),
+        **_headcounts_from_ids(pids=pids, eids=eids, rids_f=rids_f, rids_t=rids_t),
+    }
+    populations = _populations_from_ids(pids=pids, eids=eids, rids_f=rids_f, rids_t=rids_t)
+
+    return counts, populations
+
+
+def population_gaps(counts: dict[str, int], populations: dict[str, set]) -> pd.DataFrame:
+    """
+    Compare each published headcount with the number of students flagged for it.
+
+    Parameters
+    ----------
+    counts : dict of str to int
+        Metric name -> headcount, e.g. from term_headcounts_and_populations.
+    populations : dict of str to set
+        Metric name -> student IDs, from the same call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns metric, figure, ids_flagged, difference (figure - ids_flagged) and
+        note, one row per metric in populations. note explains a non-zero difference.
+    """
+    rows = []
+    for metric, ids in populations.items():
+        figure = counts[metric]
+        difference = figure - len(ids)
+        rows.append({
+            "metric": metric,
+            "figure": figure,
+            "ids_flagged": len(ids),
+            "difference": difference,
+            "note": POPULATION_GAP_NOTES.get(metric, "") if difference else "",
+        })
+
+    return pd.DataFrame(rows, columns=["metric", "figure", "ids_flagged", "difference", "note"])
@@ -5,12 +5,12 @@
 
 
 from pathlib import Path
-from typing import Union
+from typing import Iterable, Optional, Union
 
 import pandas as pd
 
 
-def infer_and_read_file(file: Union[str, Path]) -> pd.DataFrame:
+def infer_and_read_file(file: Union[str, Path], usecols: Optional[Iterable[str]] = None) -> pd.DataFrame:
     """
     Read a file into a pandas DataFrame, inferring its extension.
 
@@ -22,6 +22,8 @@ def infer_and_read_file(file: Union[str, Path]) -> pd.DataFrame:
     Parameters
     ----------
     file : str or pathlib.Path : Path to the input file.
+    usecols : iterable of str, optional : Only read these columns. Unused columns
+        are dropped by the reader itself, so they are never held in memory.
 
     Returns
     -------
@@ -44,12 +46,15 @@ def infer_and_read_file(file: Union[str, Path]) -> pd.DataFrame:
 
     ext = path.suffix.lower()
 
+    if usecols is not None:
+        usecols = list(usecols)
+
     if ext == '.xlsx':
-        out = pd.read_excel(path, dtype=str)
+        out = pd.read_excel(path, dtype=str, usecols=usecols)
     elif ext == '.csv':
-        out = pd.read_csv(path, dtype=str)
+        out = pd.read_csv(path, dtype=str, usecols=usecols)
     elif ext == '.txt':
-        out = pd.read_csv(path, dtype=str, sep='\t')
+        out = pd.read_csv(path, dtype=str, sep='\t', usecols=usecols)
     else:
         raise ValueError(f'Unsupported file type: {ext}. Allowed values: {allowed}')
 
@@ -0,0 +1,98 @@
+import sys
+import warnings
+
+def peak_memory_mb() -> float | None:
+    """
+    Peak resident memory of this process since it started, as reported by the
+    operating system (so it includes the file parsers' own buffers).
+
+    Uses resource.getrusage on Linux/macOS and GetProcessMemoryInfo on Windows;
+    neither adds any overhead to the run.
+
+    Returns
+    -------
+    float or None
+        Peak memory (MB) of the current process, or None (with a warning) if the
+        operating system call fails.
+    """
+    try:
+        return _read_peak_memory_mb()
+    except Exception as err:  # a failed OS call must not stop an otherwise good run
+        warnings.warn(f"Could not read peak process memory; skipping the memory check: {err}")
+        return None
+
+
+def _read_peak_memory_mb() -> float:
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+        get_process_memory_info = ctypes.WinDLL("psapi").GetProcessMemoryInfo
+        get_process_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        get_process_memory_info.restype = wintypes.BOOL
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not get_process_memory_info(process, ctypes.byref(counters), counters.cb):
+            raise OSError("GetProcessMemoryInfo failed.")
+        return counters.PeakWorkingSetSize / 1024**2
+
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def check_memory_budget(budget_mb: float, stage: str) -> float:
+    """
+    Report peak memory and stop the run if it has gone over budget.
+
+    The check runs after a stage has finished, so it cannot stop a single stage
+    from going past the budget; it stops the run before the next stage adds more.
+
+    Params
+    ------
+    budget_mb : float
+        Maximum peak memory (MB) allowed for the run.
+    stage : str
+        Name of the pipeline step just completed, used in the error.
+
+    Returns
+    -------
+    float or None
+        Peak memory (MB) so far, or None if it could not be read (the check is
+        skipped with a warning).
+
+    Raises
+    ------
+    ValueError
+        If budget_mb is not a positive number.
+    MemoryError
+        If peak memory so far is greater than budget_mb.
+    """
+    if not isinstance(budget_mb, (int, float)) or budget_mb <= 0:
+        raise ValueError(f"budget_mb must be a positive number: {budget_mb}")
+
+    peak = peak_memory_mb()
+
+    if peak is not None and peak > budget_mb:
+        raise MemoryError(
+            f"Peak memory {peak:,.1f} MB after '{stage}' exceeds the memory budget of {budget_mb:,.1f} MB."
+        )
+
+    return peak
@@ -1,10 +1,19 @@
+import csv
 from pathlib import Path
 from datetime import date
 from importlib.metadata import version
 import pandas as pd
+from openpyxl import Workbook
 from ir_pell_accepts.checks import validate_filename, validate_extension
+from ir_pell_accepts.helper import calc_percent
 
-def construct_results_filename(file: Path, append_today: bool = True, append_version: bool = True) -> Path:
+def construct_results_filename(
+    file: Path,
+    append_today: bool = True,
+    append_version: bool = True,
+    run_date: date | None = None,
+    pkg_version: str | None = None
+) -> Path:
     """
     Create the file name for the results file and append today's date and package version by default.
 
@@ -16,13 +25,17 @@ def construct_results_filename(file: Path, append_today: bool = True, append_ver
         Add today's date to the file name (e.g. 11-25-2025)
     append_version : bool
         Append the version of the python package used (e.g. v0.1.0)
+    run_date : date
+        Date to append instead of today's, e.g. when exporting a stored run.
+    pkg_version : str
+        Version to append instead of the installed one (e.g. "0.1.0").
     """
     file = validate_filename(file)
-    todays_date = date.today().strftime("%Y-%m-%d") if append_today else None
-    pkg_version = "v" + version("ir_pell_accepts") if append_version else None
+    date_part = (run_date or date.today()).strftime("%Y-%m-%d") if append_today else None
+    version_part = "v" + (pkg_version or version("ir_pell_accepts")) if append_version else None
 
     # Remove None's/blanks
-    parts = [file.stem, todays_date, pkg_version]
+    parts = [file.stem, date_part, version_part]
     parts = [p for p in parts if p]
 
     return Path("_".join(parts) + file.suffix)
@@ -56,18 +69,158 @@ def contruct_results_df(
     return pd.DataFrame(results)
 
 
-def output_results(df: pd.DataFrame, file_path: Path, append_today: bool = True, append_version: bool = True) -> None:
+def results_df_from_headcounts(counts: dict[str, int]) -> pd.DataFrame:
     """
-    Output results to excel, csv, or tab/.txt
+    Build the results dataframe from a dict of headcounts keyed by result column
+    (e.g. headcount_calcs.term_headcounts), calculating the percentages to 2 decimals.
     """
+    return contruct_results_df(
+        cohort_first       = counts["grs_cohort"],
+        pell_first         = counts["grs_cohort_pell"],
+        headcount_nottr    = counts["fall_enrollment"],
+        pell_nottr         = counts["fall_enrollment_pell"],
+        headcount_transfer = counts["fall_transfer_enrollment"],
+        transfer_pell      = counts["fall_transfer_enroll_pell"],
+        headcount          = counts["total_enrollment"],
+        pell_first_pct     = calc_percent(counts["grs_cohort_pell"], counts["grs_cohort"]),
+        pell_nottr_pct     = calc_percent(counts["fall_enrollment_pell"], counts["fall_enrollment"], 2),
+        pell_transfer_pct  = calc_percent(counts["fall_transfer_enroll_pell"], counts["fall_transfer_enrollment"], 2)
+    )
+
+
+def _construct_outfile(
+    file_path: Path,
+    append_today: bool,
+    append_version: bool,
+    run_date: date | None = None,
+    pkg_version: str | None = None
+) -> Path:
     file = file_path.name
     if not file:
         raise ValueError(f"file_path must have a filename: {file_path}")
-    
-    file = construct_results_filename(file, append_today=append_today, append_version=append_version)
-    
+
+    file = construct_results_filename(
+        file, append_today=append_today, append_version=append_version, run_date=run_date, pkg_version=pkg_version
+    )
+
     outfile = file_path.parent / file
-    ext = validate_extension(outfile.suffix)
+    validate_extension(outfile.suffix)
+
+    return outfile
+
+
+def output_drilldown(
+    populations: dict[str, set],
+    file_path: Path,
+    id_column: str = "ID",
+    append_today: bool = True,
+    append_version: bool = True,
+    run_date: date | None = None,
+    pkg_version: str | None = None,
+    gaps: pd.DataFrame | None = None
+) -> Path:
+    """
+    Output one row per student with a 1/0 membership flag for each metric.
+
+    Rows are streamed to the file one at a time (openpyxl write-only mode for
+    .xlsx), so the full sheet is never built in memory.
+
+    If gaps is given (see headcount_calcs.population_gaps), it is written as a
+    "reconciliation" sheet for .xlsx, or next to the drilldown as
+    "<name>_reconciliation.<ext>" for .csv/.txt, so readers can see where a flag
+    column does not sum to the published figure.
+
+    Params
+    ------
+    populations : dict of str to set
+        Metric name -> student IDs, e.g. from headcount_calcs.metric_populations.
+    file_path : Path object from pathlib
+        Full path of the drilldown file; the name is stamped like the results file.
+    id_column : str
+        Header for the ID column.
+    append_today : bool
+        Add today's date to the file name (e.g. 11-25-2025)
+    append_version : bool
+        Append the version of the python package used (e.g. v0.1.0)
+    run_date, pkg_version
+        Override the date and version appended (see construct_results_filename).
+    gaps : pandas.DataFrame
+        Published figure vs number of IDs flagged, per metric.
+
+    Returns
+    -------
+    Path
+        The drilldown file written.
+    """
+    outfile = _construct_outfile(
+        file_path, append_today=append_today, append_version=append_version, run_date=run_date, pkg_version=pkg_version
+    )
+
+    metrics = list(populations)
+    header = [id_column, *metrics]
+    ids = sorted(set().union(*populations.values()))
+    rows = ([sid, *(int(sid in populations[m]) for m in metrics)] for sid in ids)
+
+    if outfile.suffix == ".xlsx":
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("drilldown")
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
+        if gaps is not None:
+            ws = wb.create_sheet("reconciliation")
+            ws.append(list(gaps.columns))
+            for row in gaps.itertuples(index=False):
+                ws.append([v.item() if hasattr(v, "item") else v for v in row])
+        wb.save(outfile)
+    else:
+        sep = "\t" if outfile.suffix == ".txt" else ","
+        with outfile.open("w", newline="") as f:
+            writer = csv.writer(f, delimiter=sep)
+            writer.writerow(header)
+            writer.writerows(rows)
+        if gaps is not None:
+            gaps.to_csv(outfile.with_name(outfile.stem + "_reconciliation" + outfile.suffix), index=False, sep=sep)
+
+    return outfile
+
+
+def output_results(
+    df: pd.DataFrame,
+    file_path: Path,
+    append_today: bool = True,
+    append_version: bool = True,
+    populations: dict[str, set] | None = None,
+    id_column: str = "ID",
+    run_date: date | None = None,
+    pkg_version: str | None = None,
+    population_gaps: pd.DataFrame | None = None
+) -> None:
+    """
+    Output results to excel, csv, or tab/.txt
+
+    If populations is given (see headcount_calcs.term_headcounts_and_populations), a
+    student-level drilldown is also written next to the results file as
+    "<name>_drilldown.<ext>", with population_gaps as its reconciliation (see output_drilldown).
+    run_date and pkg_version override the date and version stamped into the file
+    names (see construct_results_filename).
+    """
+    outfile = _construct_outfile(
+        file_path, append_today=append_today, append_version=append_version, run_date=run_date, pkg_version=pkg_version
+    )
+    ext = outfile.suffix
+
+    if populations is not None:
+        output_drilldown(
+            populations,
+            file_path.with_name(file_path.stem + "_drilldown" + file_path.suffix),
+            id_column=id_column,
+            append_today=append_today,
+            append_version=append_version,
+            run_date=run_date,
+            pkg_version=pkg_version,
+            gaps=population_gaps
+        )
 
     if ext == ".xlsx":
         df.to_excel(outfile, index=False)
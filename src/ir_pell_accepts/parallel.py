@@ -0,0 +1,164 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from ir_pell_accepts.helper import construct_cohort
+from ir_pell_accepts.headcount_calcs import (
+    grs_cohort, _pell_id_values, _enrolled_id_values, _cohort_id_values,
+    _incoming_transfer_cohort, _headcounts_from_ids
+)
+from ir_pell_accepts.checks import validate_pell_columns, validate_cohort_columns, validate_enrollment_columns
+from ir_pell_accepts.output import results_df_from_headcounts
+
+def _as_int_ids(values: list[pd.Series]) -> list[np.ndarray]:
+    # int64 copies of the IDs if every one of them is a whole number, else the IDs unchanged.
+    # int64 arrays pickle as one buffer and shard by id % n_shards, the same in every process.
+    try:
+        ids = []
+        for v in values:
+            if not (pd.api.types.is_integer_dtype(v) or pd.api.types.is_object_dtype(v) or pd.api.types.is_string_dtype(v)):
+                raise TypeError(f"IDs of dtype {v.dtype} are not compared as integers")
+            ids.append(v.astype(np.int64).to_numpy())
+        return ids
+    except (TypeError, ValueError, OverflowError):
+        return [v.to_numpy() for v in values]
+
+
+def _split_ids(ids: np.ndarray, n_shards: int) -> list[np.ndarray]:
+    # ids split into n_shards arrays by shard key, in one sort
+    if ids.dtype == np.int64:
+        key = ids % n_shards
+    else:
+        # Built-in hash is salted per process, so this key is only used in the parent
+        key = np.fromiter(map(hash, ids), dtype=np.int64, count=len(ids)) % n_shards
+
+    order = np.argsort(key, kind="stable")
+    bounds = np.searchsorted(key[order], np.arange(n_shards + 1))
+    ids = ids[order]
+    return [ids[bounds[i]:bounds[i + 1]] for i in range(n_shards)]
+
+
+def _shard_headcounts(shard: list[tuple[np.ndarray, ...]]) -> list[Counter]:
+    # Runs in a worker process; must stay a module-level function so it can be pickled.
+    # shard holds one (pell, enrolled, first-time cohort, transfer cohort) ID tuple per term.
+    return [Counter(_headcounts_from_ids(*(set(ids) for ids in term_ids))) for term_ids in shard]
+
+
+def _sum_shards(shard_results, n_terms: int) -> list[Counter]:
+    # Counter.update adds values, keeping the negative ones fall_enrollment can produce
+    totals = [Counter() for _ in range(n_terms)]
+    for shard in shard_results:
+        for total, counts in zip(totals, shard):
+            total.update(counts)
+    return totals
+
+
+def sharded_headcounts(
+    dfp: pd.DataFrame,
+    dfr: pd.DataFrame,
+    dfe: pd.DataFrame,
+    id_column: str,
+    terms: list[str],
+    n_workers: int | None = None,
+    n_shards: int | None = None
+) -> pd.DataFrame:
+    """
+    Results for one or more terms, with the ID set work split over a process pool.
+
+    This process filters each term's Pell, enrolled and cohort IDs (as
+    term_headcounts does) and splits them into shards by ID. The workers receive
+    only those ID arrays and build the sets. Every student falls in exactly one
+    shard, so each distinct-ID headcount (and the enrollment difference in
+    fall_enrollment) is the sum of its per-shard values. grs_cohort counts rows and
+    is calculated in this process. Percentages are calculated after summing.
+
+    IDs must be standardized (see clean.remove_leading_zeros). If every ID is a
+    whole number they are compared as integers, so "123" and 123 are one student;
+    otherwise they are compared as they are, as in term_headcounts.
+
+    Performance
+    -----------
+    Only the set work runs in parallel; the row filtering stays in this process
+    and is about half of the single-process time. Benchmark (3M enrollment, 1M
+    cohort and 1M Pell rows, IDs cleaned, filter columns categorical as in
+    memory-budget mode, 8 shards; seconds for 1 term / 10 terms):
+
+        single process, term_headcounts per term                0.4 / 4.2
+        sharded, serial work in this process                    0.3 / 2.8
+        sharded, set work of the largest shard                  0.1 / 0.1
+
+    Starting a pool of 8 workers took another 0.2 seconds with fork and 5.6 with
+    spawn (the Windows default, where each worker imports pandas), on one core.
+    So for a single term the pool cannot beat one core, and run.py does not use
+    it. For 10 terms on 8 cores with fork the best case is about 3.1 seconds.
+
+    Parameters
+    ----------
+    dfp : pandas.DataFrame
+        Pell awards dataframe.
+    dfr : pandas.DataFrame
+        Retention / cohort dataframe.
+    dfe : pandas.DataFrame
+        Census Date Enrollment dataframe.
+    id_column : str
+        Column to use for student IDs; must exist in all dataframes (e.g., "ID").
+    terms : list of str
+        Academic terms (e.g. ["202480", "202580"]).
+    n_workers : int, optional
+        Number of worker processes. Defaults to the number of CPU cores; 1 runs
+        the shards in this process.
+    n_shards : int, optional
+        Number of ID shards. Defaults to n_workers.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per term: a "term" column followed by the columns of
+        output.contruct_results_df.
+
+    Raises
+    ------
+    ValueError
+        If any of the required column names are not present in their respective dataframes.
+    """
+    validate_pell_columns(df=dfp, id_column=id_column)
+    validate_cohort_columns(df=dfr, id_column=id_column)
+    validate_enrollment_columns(df=dfe, id_column=id_column)
+
+    n_workers = n_workers or os.cpu_count() or 1
+    n_shards = n_shards or n_workers
+    if not isinstance(n_shards, int) or n_shards < 1:
+        raise ValueError(f"n_shards must be a positive integer: {n_shards}")
+
+    # Pell, enrolled, first-time cohort and transfer cohort IDs of every term, in one list
+    # so they are all converted to integers, or all left as they are
+    values = []
+    for term in terms:
+        values += [
+            _pell_id_values(dfp, id_column=id_column, term=term),
+            _enrolled_id_values(dfe, id_column=id_column, term=term),
+            _cohort_id_values(dfr, id_column=id_column, cohort=construct_cohort(term)),
+            _cohort_id_values(dfr, id_column=id_column, cohort=_incoming_transfer_cohort(term)),
+        ]
+    split = [_split_ids(ids, n_shards) for ids in _as_int_ids(values)]
+
+    # shards[i]: one (pids, eids, rids_f, rids_t) tuple per term, holding only the IDs of shard i
+    shards = [
+        [tuple(s[i] for s in split[4 * t:4 * t + 4]) for t in range(len(terms))]
+        for i in range(n_shards)
+    ]
+
+    if n_workers == 1:
+        totals = _sum_shards(map(_shard_headcounts, shards), len(terms))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            totals = _sum_shards(executor.map(_shard_headcounts, shards), len(terms))
+
+    results = []
+    for term, counts in zip(terms, totals):
+        counts["grs_cohort"] = grs_cohort(dfr=dfr, id_column=id_column, term=term)
+        results.append(results_df_from_headcounts(counts).assign(term=term))
+
+    df = pd.concat(results, ignore_index=True)
+    return df[["term", *df.columns.drop("term")]]
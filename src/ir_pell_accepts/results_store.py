@@ -0,0 +1,308 @@
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+from importlib.metadata import version
+import pandas as pd
+from ir_pell_accepts.output import output_results
+
+# One row per (run, metric). Long format keeps the schema stable when metrics are
+# added to contruct_results_df; value has no type affinity so counts stay integers.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    term            TEXT NOT NULL,
+    segment         TEXT NOT NULL,
+    run_timestamp   TEXT NOT NULL,
+    package_version TEXT NOT NULL,
+    metric          TEXT NOT NULL,
+    value,
+    PRIMARY KEY (term, segment, run_timestamp, package_version, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_results_metric ON results (metric, segment, term, run_timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_version ON results (package_version, segment, term, metric);
+"""
+
+
+def open_results_store(db_path: Path) -> sqlite3.Connection:
+    """
+    Open (creating if needed) the SQLite results history store.
+
+    Params
+    ------
+    db_path : Path object from pathlib
+        Path to the .sqlite/.db file. The parent folder must exist.
+
+    Returns
+    -------
+    sqlite3.Connection
+    """
+    db_path = Path(db_path)
+    if not db_path.parent.exists():
+        raise FileNotFoundError(f"Results store folder does not exist: {db_path.parent}")
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def append_results(
+    conn: sqlite3.Connection,
+    df: pd.DataFrame,
+    term: str | None = None,
+    segment: str = "all",
+    run_timestamp: str | None = None,
+    package_version: str | None = None
+) -> str:
+    """
+    Append a results dataframe (see output.contruct_results_df) to the store in one transaction.
+
+    Each row of df is one term/segment. If df has "term" or "segment" columns they
+    are used per row, otherwise the term and segment arguments apply to every row.
+
+    Params
+    ------
+    conn : sqlite3.Connection
+        From open_results_store.
+    df : pandas.DataFrame
+        Results, one column per metric.
+    term : str
+        Term e.g. "202580". Required unless df has a "term" column.
+    segment : str
+        Population segment the results describe, "all" for the whole university.
+    run_timestamp : str
+        ISO format (e.g. "2025-11-26T10:00:00"). Defaults to now.
+    package_version : str
+        Defaults to the installed ir_pell_accepts version.
+
+    Returns
+    -------
+    str
+        The run_timestamp the rows were stored under.
+
+    Raises
+    ------
+    ValueError
+        If no term is given, run_timestamp is not an ISO timestamp, or the same
+        term/segment appears twice in df.
+    """
+    if term is None and "term" not in df.columns:
+        raise ValueError("term must be given when df has no 'term' column.")
+
+    run_timestamp = run_timestamp or datetime.now().isoformat()
+    try:
+        datetime.fromisoformat(run_timestamp)
+    except (TypeError, ValueError):
+        raise ValueError(f"run_timestamp must be an ISO format timestamp (e.g. 2025-11-26T10:00:00): {run_timestamp}")
+    package_version = package_version or version("ir_pell_accepts")
+
+    metrics = [c for c in df.columns if c not in ("term", "segment")]
+
+    rows = []
+    seen = set()
+    for record in df.to_dict("records"):
+        row_term = str(record.get("term", term))
+        row_segment = str(record.get("segment", segment))
+        if (row_term, row_segment) in seen:
+            raise ValueError(f"term {row_term}, segment {row_segment} appears more than once in df.")
+        seen.add((row_term, row_segment))
+
+        for metric in metrics:
+            value = record[metric]
+            rows.append((row_term, row_segment, run_timestamp, package_version, metric, value.item() if hasattr(value, "item") else value))
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO results (term, segment, run_timestamp, package_version, metric, value) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    return run_timestamp
+
+
+def _resolve_run(
+    conn: sqlite3.Connection,
+    term: str,
+    segment: str,
+    run_timestamp: str | None,
+    package_version: str | None
+) -> tuple[str, str]:
+    # (run_timestamp, package_version) of the stored run matching the arguments, latest first
+    query = "SELECT run_timestamp, package_version FROM results WHERE term = ? AND segment = ?"
+    params = [term, segment]
+    if run_timestamp is not None:
+        query += " AND run_timestamp = ?"
+        params.append(run_timestamp)
+    if package_version is not None:
+        query += " AND package_version = ?"
+        params.append(package_version)
+    row = conn.execute(query + " ORDER BY run_timestamp DESC LIMIT 1", params).fetchone()
+
+    if row is None:
+        raise ValueError(
+            f"No stored results for term {term}, segment {segment}, "
+            f"run {run_timestamp}, version {package_version}."
+        )
+
+    return row
+
+
+def load_results(
+    conn: sqlite3.Connection,
+    term: str,
+    segment: str = "all",
+    run_timestamp: str | None = None,
+    package_version: str | None = None
+) -> pd.DataFrame:
+    """
+    Rebuild the results dataframe of one stored run, in the same layout as
+    output.contruct_results_df.
+
+    Params
+    ------
+    term : str
+        Term e.g. "202580".
+    segment : str
+        Population segment, "all" for the whole university.
+    run_timestamp : str
+        Run to load. Defaults to the latest run (of package_version, if given).
+    package_version : str
+        Restrict to runs made with this package version (e.g. "0.2.0").
+
+    Raises
+    ------
+    ValueError
+        If no matching run is stored.
+    """
+    run_timestamp, package_version = _resolve_run(conn, term, segment, run_timestamp, package_version)
+    return _load_run(conn, term, segment, run_timestamp, package_version)
+
+
+def _load_run(conn: sqlite3.Connection, term: str, segment: str, run_timestamp: str, package_version: str) -> pd.DataFrame:
+    # Results dataframe of a run already resolved by _resolve_run
+    rows = conn.execute(
+        "SELECT metric, value FROM results "
+        "WHERE term = ? AND segment = ? AND run_timestamp = ? AND package_version = ? ORDER BY rowid",
+        [term, segment, run_timestamp, package_version]
+    ).fetchall()
+
+    return pd.DataFrame([dict(rows)])
+
+
+def query_trend(
+    conn: sqlite3.Connection,
+    metric: str,
+    segment: str = "all",
+    package_version: str | None = None
+) -> pd.DataFrame:
+    """
+    The value of one metric across terms, taken from the latest run of each term.
+
+    Params
+    ------
+    metric : str
+        Column of the results dataframe, e.g. "pell_pct".
+    segment : str
+        Population segment, "all" for the whole university.
+    package_version : str
+        Only consider runs made with this package version.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns term, run_timestamp, package_version, value; one row per term.
+    """
+    version_filter = "AND package_version = :version" if package_version is not None else ""
+    query = f"""
+        SELECT term, run_timestamp, package_version, value
+        FROM results AS r
+        WHERE metric = :metric AND segment = :segment {version_filter}
+          AND run_timestamp = (
+              SELECT MAX(run_timestamp) FROM results
+              WHERE metric = r.metric AND segment = r.segment AND term = r.term {version_filter}
+          )
+        ORDER BY term
+    """
+    params = {"metric": metric, "segment": segment, "version": package_version}
+
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def diff_versions(
+    conn: sqlite3.Connection,
+    old_version: str,
+    new_version: str,
+    segment: str = "all",
+    term: str | None = None
+) -> pd.DataFrame:
+    """
+    Compare the latest run of two package versions, metric by metric.
+
+    Params
+    ------
+    old_version, new_version : str
+        Package versions to compare, e.g. "0.1.0" and "0.2.0".
+    segment : str
+        Population segment, "all" for the whole university.
+    term : str
+        Restrict to one term. Defaults to every term run under both versions.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns term, metric, old, new, diff (new - old). old, new and diff keep
+        the stored types, so headcounts are ints and percentages floats, as in
+        output.contruct_results_df.
+    """
+    term_filter = "AND term = :term" if term is not None else ""
+    query = f"""
+        WITH latest AS (
+            SELECT r.term, r.metric, r.package_version, r.value
+            FROM results AS r
+            WHERE r.segment = :segment AND r.package_version IN (:old, :new) {term_filter}
+              AND r.run_timestamp = (
+                  SELECT MAX(run_timestamp) FROM results
+                  WHERE metric = r.metric AND segment = r.segment
+                    AND term = r.term AND package_version = r.package_version
+              )
+        )
+        SELECT o.term, o.metric, o.value AS old, n.value AS new, n.value - o.value AS diff
+        FROM latest AS o
+        JOIN latest AS n ON n.term = o.term AND n.metric = o.metric
+        WHERE o.package_version = :old AND n.package_version = :new
+        ORDER BY o.term, o.metric
+    """
+    params = {"segment": segment, "old": old_version, "new": new_version, "term": term}
+
+    # Not read_sql_query: it would coerce the mixed int/float value columns to float
+    rows = conn.execute(query, params).fetchall()
+    return pd.DataFrame(rows, columns=["term", "metric", "old", "new", "diff"], dtype=object)
+
+
+def export_results(
+    conn: sqlite3.Connection,
+    file_path: Path,
+    term: str,
+    segment: str = "all",
+    run_timestamp: str | None = None,
+    package_version: str | None = None,
+    append_today: bool = True,
+    append_version: bool = True
+) -> None:
+    """
+    Write a stored run to excel, csv, or tab/.txt through output.output_results,
+    exactly as the pipeline writes its results file.
+
+    The file name is stamped with the date and package version of the stored run,
+    not today's date and the installed version.
+
+    See load_results for the run selection parameters.
+    """
+    run_timestamp, package_version = _resolve_run(conn, term, segment, run_timestamp, package_version)
+    df = _load_run(conn, term, segment, run_timestamp, package_version)
+    output_results(
+        df,
+        file_path,
+        append_today=append_today,
+        append_version=append_version,
+        run_date=datetime.fromisoformat(run_timestamp).date(),
+        pkg_version=package_version
+    )